@@ -168,7 +168,7 @@ def mag(coordinates, sources, moment, field, scale=True):
             components=["x", "y", "z"],
             check_input=False,
         )
-        G = -(mx * Gx + my * Gy + mz * Gz)
+        result = -(Gx @ mx + Gy @ my + Gz @ mz)
     elif field is "x":
         Gxx, Gxy, Gxz = id.grad_tensor(
             data_points=coordinates,
@@ -177,7 +177,7 @@ def mag(coordinates, sources, moment, field, scale=True):
             components=["xx", "xy", "xz"],
             check_input=False,
         )
-        G = mx * Gxx + my * Gxy + mz * Gxz
+        result = Gxx @ mx + Gxy @ my + Gxz @ mz
     elif field is "y":
         Gxy, Gyy, Gyz = id.grad_tensor(
             data_points=coordinates,
@@ -186,7 +186,7 @@ def mag(coordinates, sources, moment, field, scale=True):
             components=["xy", "yy", "yz"],
             check_input=False,
         )
-        G = mx * Gxy + my * Gyy + mz * Gyz
+        result = Gxy @ mx + Gyy @ my + Gyz @ mz
     else:  # field is "z"
         Gxz, Gyz, Gzz = id.grad_tensor(
             data_points=coordinates,
@@ -195,10 +195,7 @@ def mag(coordinates, sources, moment, field, scale=True):
             components=["xz", "yz", "zz"],
             check_input=False,
         )
-        G = mx * Gxz + my * Gyz + mz * Gzz
-
-    # compute the potential field
-    result = np.sum(G, axis=1)
+        result = Gxz @ mx + Gyz @ my + Gzz @ mz
 
     # multiply the computed field by the corresponding scale factors
     if scale is True:
@@ -1,15 +1,17 @@
 """
 This code presents a general approach for implementing the gravitational
 and magnetic induction fields produced by rectangular prisms by using the closed-form formulas of
-Nagy et al (2000, 2002). This prototype makes use of the modified arctangent and logarithm 
+Nagy et al (2000, 2002). This prototype makes use of the modified arctangent and logarithm
 functions proposed by Fukushima (2020) for dealing with singularities at some computation points.
 """
 
 import numpy as np
+import math
+from numba import njit, vectorize, guvectorize
+from . import rectangular_prism_numba as rp_nb
 from .. import check
 from .. import utils
 from .. import constants as cts
-from .. import inverse_distance as idist
 
 
 def grav(coordinates, prisms, density, field, scale=True):
@@ -63,26 +65,35 @@ def grav(coordinates, prisms, density, field, scale=True):
     P = check.are_rectangular_prisms(prisms)  # P = total number of prisms
     check.is_array(density, ndim=1, shape=(P,))
 
-    # Available kernels
-    kernels = {
-        "potential": kernel_potential_grav,
-        "x": kernel_x,
-        "y": kernel_y,
-        "z": kernel_z,
-        "xx": kernel_xx,
-        "xy": kernel_xy,
-        "xz": kernel_xz,
-        "yy": kernel_yy,
-        "yz": kernel_yz,
-        "zz": kernel_zz,
+    # Available fused kernels of the shared jitted path
+    fields = {
+        "potential": rp_nb.FIELD_POTENTIAL,
+        "x": rp_nb.FIELD_X,
+        "y": rp_nb.FIELD_Y,
+        "z": rp_nb.FIELD_Z,
+        "xx": rp_nb.FIELD_XX,
+        "xy": rp_nb.FIELD_XY,
+        "xz": rp_nb.FIELD_XZ,
+        "yy": rp_nb.FIELD_YY,
+        "yz": rp_nb.FIELD_YZ,
+        "zz": rp_nb.FIELD_ZZ,
     }
 
     # Verify the field
-    if field not in kernels:
+    if field not in fields:
         raise ValueError("Gravitational field {} not recognized".format(field))
 
-    # compute the contribution of each vertex
-    result = iterate_over_vertices(coordinates, prisms, density, kernels[field])
+    # compute the field with the jitted loop over computation points,
+    # shared with the numba module; iterate_over_vertices is kept as the
+    # reference implementation that sums the 8 signed vertex
+    # contributions through the entrywise kernels in a generalized ufunc
+    cx, cy, cz, x1, x2, y1, y2, z1, z2, density = rp_nb._unpack_arrays(
+        coordinates, prisms, density
+    )
+    result = np.zeros(D, dtype="float64")
+    rp_nb.jit_grav(
+        cx, cy, cz, x1, x2, y1, y2, z1, z2, density, fields[field], result
+    )
 
     # multiply the computed field by the corresponding scale factors
     if scale is True:
@@ -144,29 +155,58 @@ def mag(coordinates, prisms, mx, my, mz, field, scale=True):
     check.is_array(my, ndim=1, shape=(P,))
     check.is_array(mz, ndim=1, shape=(P,))
 
-    # Available kernels
-    kernels = {
-        "potential": {"x": kernel_x, "y": kernel_y, "z": kernel_z},
-        "z": {"x": kernel_xz, "y": kernel_yz, "z": kernel_zz},
-        "y": {"x": kernel_xy, "y": kernel_yy, "z": kernel_yz},
-        "x": {"x": kernel_xx, "y": kernel_xy, "z": kernel_xz},
+    # Available fused kernels of the shared jitted path
+    fields = {
+        "potential": {
+            "x": rp_nb.FIELD_X,
+            "y": rp_nb.FIELD_Y,
+            "z": rp_nb.FIELD_Z,
+        },
+        "z": {
+            "x": rp_nb.FIELD_XZ,
+            "y": rp_nb.FIELD_YZ,
+            "z": rp_nb.FIELD_ZZ,
+        },
+        "y": {
+            "x": rp_nb.FIELD_XY,
+            "y": rp_nb.FIELD_YY,
+            "z": rp_nb.FIELD_YZ,
+        },
+        "x": {
+            "x": rp_nb.FIELD_XX,
+            "y": rp_nb.FIELD_XY,
+            "z": rp_nb.FIELD_XZ,
+        },
     }
 
     # Verify the field
-    if field not in kernels:
+    if field not in fields:
         raise ValueError("Magnetic field {} not recognized".format(field))
 
-    # compute the contribution of each vertex
-    resultx = iterate_over_vertices(
-        coordinates, prisms, mx, kernels[field]["x"]
-    )
-    resulty = iterate_over_vertices(
-        coordinates, prisms, my, kernels[field]["y"]
+    # compute the three magnetization components in a single pass over
+    # the geometry with the jitted loop shared with the numba module
+    cx, cy, cz, x1, x2, y1, y2, z1, z2, mx, my, mz = rp_nb._unpack_arrays(
+        coordinates, prisms, mx, my, mz
     )
-    resultz = iterate_over_vertices(
-        coordinates, prisms, mz, kernels[field]["z"]
+    result = np.zeros(D, dtype="float64")
+    rp_nb.jit_mag(
+        cx,
+        cy,
+        cz,
+        x1,
+        x2,
+        y1,
+        y2,
+        z1,
+        z2,
+        mx,
+        my,
+        mz,
+        fields[field]["x"],
+        fields[field]["y"],
+        fields[field]["z"],
+        result,
     )
-    result = resultx + resulty + resultz
 
     # multiply the computed field by the corresponding scale factors
     if scale is True:
@@ -184,158 +224,450 @@ def mag(coordinates, prisms, mx, my, mz, field, scale=True):
 # iterate over vertices
 def iterate_over_vertices(coordinates, prisms, sigma, kernel):
     """
-    Function for iterating over the vertices of the rectangular prisms
-    by using numpy with broadcasting
+    Function for iterating over the vertices of the rectangular prisms.
+    The loops over computation points and prisms run inside the
+    generalized ufunc 'accumulate_vertex', which evaluates the entrywise
+    version of 'kernel' selected through the integer ids of
+    'rectangular_prism_numba', so no (points, prisms) array is ever
+    allocated.
     """
-    predicted_field = np.zeros(
-        (coordinates["x"].size, prisms["x1"].size), dtype="float"
-    )
+    # entrywise twin of each vectorized kernel
+    kernel_ids = {
+        kernel_potential_grav: rp_nb.FIELD_POTENTIAL,
+        kernel_x: rp_nb.FIELD_X,
+        kernel_y: rp_nb.FIELD_Y,
+        kernel_z: rp_nb.FIELD_Z,
+        kernel_xx: rp_nb.FIELD_XX,
+        kernel_xy: rp_nb.FIELD_XY,
+        kernel_xz: rp_nb.FIELD_XZ,
+        kernel_yy: rp_nb.FIELD_YY,
+        kernel_yz: rp_nb.FIELD_YZ,
+        kernel_zz: rp_nb.FIELD_ZZ,
+    }
+    kernel_id = kernel_ids[kernel]
+    cx, cy, cz = rp_nb._unpack_coordinates(coordinates)
+    x1, x2, y1, y2, z1, z2 = rp_nb._unpack_prisms(prisms)
+    vertices = {"x1": x1, "x2": x2, "y1": y1, "y2": y2, "z1": z1, "z2": z2}
+    sigma = np.ascontiguousarray(sigma, dtype="float64")
+    predicted_field = np.zeros(cx.size, dtype="float64")
     # iterate over vertices
     for i in [1, 2]:
         for j in [1, 2]:
             for k in [1, 2]:
                 sign = (-1) ** (i + j + k)
-                vertex_x = "x" + "{}".format(i)
-                vertex_y = "y" + "{}".format(j)
-                vertex_z = "z" + "{}".format(k)
-                vertex = {
-                    "x": prisms[vertex_x],
-                    "y": prisms[vertex_y],
-                    "z": prisms[vertex_z],
-                }
-                # Squared Euclidean Distance Matrix (SEDM)
-                R = np.sqrt(
-                    idist.sedm(
-                        data_points=coordinates,
-                        source_points=vertex,
-                        check_input=False,
-                    )
-                )
-                X = (
-                    -coordinates["x"][:, np.newaxis]
-                    + vertex["x"][np.newaxis, :]
+                predicted_field += accumulate_vertex(
+                    cx,
+                    cy,
+                    cz,
+                    vertices["x" + "{}".format(i)],
+                    vertices["y" + "{}".format(j)],
+                    vertices["z" + "{}".format(k)],
+                    sigma,
+                    sign,
+                    kernel_id,
                 )
-                Y = (
-                    -coordinates["y"][:, np.newaxis]
-                    + vertex["y"][np.newaxis, :]
-                )
-                Z = (
-                    -coordinates["z"][:, np.newaxis]
-                    + vertex["z"][np.newaxis, :]
-                )
-                # compute contribution of the current vertex
-                predicted_field[:] += sign * kernel(X, Y, Z, R)
-
-    predicted_field = np.sum(a=predicted_field * sigma[np.newaxis, :], axis=1)
 
     return predicted_field
 
 
 # kernels
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_potential_grav(X, Y, Z, R):
     """
     Function for computing the inverse distance kernel
     for a rectangular prism
     """
     result = (
-        X * Y * utils.safe_log(Z + R)
-        + X * Z * utils.safe_log(Y + R)
-        + Y * Z * utils.safe_log(X + R)
-        - 0.5 * Y**2 * utils.safe_atan2(Z * X, Y * R)
-        - 0.5 * X**2 * utils.safe_atan2(Z * Y, X * R)
-        - 0.5 * Z**2 * utils.safe_atan2(Y * X, Z * R)
+        X * Y * utils.safe_log_entrywise(Z + R)
+        + X * Z * utils.safe_log_entrywise(Y + R)
+        + Y * Z * utils.safe_log_entrywise(X + R)
+        - 0.5 * (Y * Y) * utils.safe_atan2_entrywise(Z * X, Y * R)
+        - 0.5 * (X * X) * utils.safe_atan2_entrywise(Z * Y, X * R)
+        - 0.5 * (Z * Z) * utils.safe_atan2_entrywise(Y * X, Z * R)
     )
     return result
 
 
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_x(X, Y, Z, R):
     """
     Function for computing the x-derivative of inverse distance kernel
     for a rectangular prism
     """
     result = -(
-        Y * utils.safe_log(Z + R)
-        + Z * utils.safe_log(Y + R)
-        - X * utils.safe_atan2(Y * Z, X * R)
+        Y * utils.safe_log_entrywise(Z + R)
+        + Z * utils.safe_log_entrywise(Y + R)
+        - X * utils.safe_atan2_entrywise(Y * Z, X * R)
     )
     return result
 
 
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_y(X, Y, Z, R):
     """
     Function for computing the y-derivative of inverse distance kernel
     for a rectangular prism
     """
     result = -(
-        X * utils.safe_log(Z + R)
-        + Z * utils.safe_log(X + R)
-        - Y * utils.safe_atan2(X * Z, Y * R)
+        X * utils.safe_log_entrywise(Z + R)
+        + Z * utils.safe_log_entrywise(X + R)
+        - Y * utils.safe_atan2_entrywise(X * Z, Y * R)
     )
     return result
 
 
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_z(X, Y, Z, R):
     """
     Function for computing the z-derivative of inverse distance kernel
     for a rectangular prism
     """
     result = -(
-        Y * utils.safe_log(X + R)
-        + X * utils.safe_log(Y + R)
-        - Z * utils.safe_atan2(Y * X, Z * R)
+        Y * utils.safe_log_entrywise(X + R)
+        + X * utils.safe_log_entrywise(Y + R)
+        - Z * utils.safe_atan2_entrywise(Y * X, Z * R)
     )
     return result
 
 
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_xx(X, Y, Z, R):
     """
     Function for computing the xx-derivative of inverse distance kernel
     for a rectangular prism
     """
-    result = -utils.safe_atan2(Y * Z, X * R)
+    result = -utils.safe_atan2_entrywise(Y * Z, X * R)
     return result
 
 
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_xy(X, Y, Z, R):
     """
     Function for computing the xy-derivativ of inverse distance kernel
     for a rectangular prism
     """
-    result = utils.safe_log(Z + R)
+    result = utils.safe_log_entrywise(Z + R)
     return result
 
 
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_xz(X, Y, Z, R):
     """
     Function for computing the xz-derivative of inverse distance kernel
     for a rectangular prism
     """
-    result = utils.safe_log(Y + R)
+    result = utils.safe_log_entrywise(Y + R)
     return result
 
 
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_yy(X, Y, Z, R):
     """
     Function for computing the yy-derivative of inverse distance kernel
     for a rectangular prism
     """
-    result = -utils.safe_atan2(X * Z, Y * R)
+    result = -utils.safe_atan2_entrywise(X * Z, Y * R)
     return result
 
 
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_yz(X, Y, Z, R):
     """
     Function for computing the yz-derivative of inverse distance kernel
     for a rectangular prism
     """
-    result = utils.safe_log(X + R)
+    result = utils.safe_log_entrywise(X + R)
     return result
 
 
+@vectorize(
+    ["float64(float64, float64, float64, float64)"],
+    target="parallel",
+    fastmath=True,
+)
 def kernel_zz(X, Y, Z, R):
     """
     Function for computing the zz-derivative of inverse distance kernel
     for a rectangular prism
     """
-    result = -utils.safe_atan2(Y * X, Z * R)
+    result = -utils.safe_atan2_entrywise(Y * X, Z * R)
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_potential_grav_entrywise(X, Y, Z, R):
+    """
+    Function for computing the inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_potential_grav' used by 'accumulate_vertex')
+    """
+    result = (
+        X * Y * utils.safe_log_entrywise(Z + R)
+        + X * Z * utils.safe_log_entrywise(Y + R)
+        + Y * Z * utils.safe_log_entrywise(X + R)
+        - 0.5 * (Y * Y) * utils.safe_atan2_entrywise(Z * X, Y * R)
+        - 0.5 * (X * X) * utils.safe_atan2_entrywise(Z * Y, X * R)
+        - 0.5 * (Z * Z) * utils.safe_atan2_entrywise(Y * X, Z * R)
+    )
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_x_entrywise(X, Y, Z, R):
+    """
+    Function for computing the x-derivative of inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_x' used by 'accumulate_vertex')
+    """
+    result = -(
+        Y * utils.safe_log_entrywise(Z + R)
+        + Z * utils.safe_log_entrywise(Y + R)
+        - X * utils.safe_atan2_entrywise(Y * Z, X * R)
+    )
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_y_entrywise(X, Y, Z, R):
+    """
+    Function for computing the y-derivative of inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_y' used by 'accumulate_vertex')
+    """
+    result = -(
+        X * utils.safe_log_entrywise(Z + R)
+        + Z * utils.safe_log_entrywise(X + R)
+        - Y * utils.safe_atan2_entrywise(X * Z, Y * R)
+    )
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_z_entrywise(X, Y, Z, R):
+    """
+    Function for computing the z-derivative of inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_z' used by 'accumulate_vertex')
+    """
+    result = -(
+        Y * utils.safe_log_entrywise(X + R)
+        + X * utils.safe_log_entrywise(Y + R)
+        - Z * utils.safe_atan2_entrywise(Y * X, Z * R)
+    )
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_xx_entrywise(X, Y, Z, R):
+    """
+    Function for computing the xx-derivative of inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_xx' used by 'accumulate_vertex')
+    """
+    result = -utils.safe_atan2_entrywise(Y * Z, X * R)
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_xy_entrywise(X, Y, Z, R):
+    """
+    Function for computing the xy-derivativ of inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_xy' used by 'accumulate_vertex')
+    """
+    result = utils.safe_log_entrywise(Z + R)
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_xz_entrywise(X, Y, Z, R):
+    """
+    Function for computing the xz-derivative of inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_xz' used by 'accumulate_vertex')
+    """
+    result = utils.safe_log_entrywise(Y + R)
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_yy_entrywise(X, Y, Z, R):
+    """
+    Function for computing the yy-derivative of inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_yy' used by 'accumulate_vertex')
+    """
+    result = -utils.safe_atan2_entrywise(X * Z, Y * R)
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_yz_entrywise(X, Y, Z, R):
+    """
+    Function for computing the yz-derivative of inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_yz' used by 'accumulate_vertex')
+    """
+    result = utils.safe_log_entrywise(X + R)
+    return result
+
+
+@njit(
+    "float64(float64, float64, float64, float64)",
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def kernel_zz_entrywise(X, Y, Z, R):
+    """
+    Function for computing the zz-derivative of inverse distance kernel
+    for a rectangular prism
+    (scalar version of 'kernel_zz' used by 'accumulate_vertex')
+    """
+    result = -utils.safe_atan2_entrywise(Y * X, Z * R)
+    return result
+
+
+@njit(
+    "float64(int64, float64, float64, float64, float64)",
+    fastmath=True,
+    cache=True,
+)
+def _dispatch_kernel(kernel_id, X, Y, Z, R):
+    """
+    Evaluate the entrywise kernel selected by 'kernel_id'. Uses the
+    integer field ids defined in 'rectangular_prism_numba'.
+    """
+    if kernel_id == rp_nb.FIELD_POTENTIAL:
+        result = kernel_potential_grav_entrywise(X, Y, Z, R)
+    elif kernel_id == rp_nb.FIELD_X:
+        result = kernel_x_entrywise(X, Y, Z, R)
+    elif kernel_id == rp_nb.FIELD_Y:
+        result = kernel_y_entrywise(X, Y, Z, R)
+    elif kernel_id == rp_nb.FIELD_Z:
+        result = kernel_z_entrywise(X, Y, Z, R)
+    elif kernel_id == rp_nb.FIELD_XX:
+        result = kernel_xx_entrywise(X, Y, Z, R)
+    elif kernel_id == rp_nb.FIELD_XY:
+        result = kernel_xy_entrywise(X, Y, Z, R)
+    elif kernel_id == rp_nb.FIELD_XZ:
+        result = kernel_xz_entrywise(X, Y, Z, R)
+    elif kernel_id == rp_nb.FIELD_YY:
+        result = kernel_yy_entrywise(X, Y, Z, R)
+    elif kernel_id == rp_nb.FIELD_YZ:
+        result = kernel_yz_entrywise(X, Y, Z, R)
+    else:
+        result = kernel_zz_entrywise(X, Y, Z, R)
     return result
+
+
+@guvectorize(
+    [
+        "(float64[:], float64[:], float64[:], float64[:], float64[:],"
+        " float64[:], float64[:], int64, int64, float64[:])"
+    ],
+    "(n),(n),(n),(m),(m),(m),(m),(),()->(n)",
+    nopython=True,
+    target="parallel",
+)
+def accumulate_vertex(cx, cy, cz, vx, vy, vz, sigma, sign, kernel_id, out):
+    """
+    Accumulate the signed contribution of one vertex of every prism at
+    every computation point, weighted by the physical property 'sigma'.
+    The loops over points and prisms run inside the generalized ufunc,
+    so the (points, prisms) arrays of the broadcast formulation are
+    never materialized.
+    """
+    for l in range(cx.size):
+        cx_l = cx[l]
+        cy_l = cy[l]
+        cz_l = cz[l]
+        acc = 0.0
+        for p in range(vx.size):
+            X = vx[p] - cx_l
+            Y = vy[p] - cy_l
+            Z = vz[p] - cz_l
+            R = math.sqrt(X * X + Y * Y + Z * Z)
+            acc += sigma[p] * _dispatch_kernel(kernel_id, X, Y, Z, R)
+        out[l] = sign * acc
@@ -0,0 +1,891 @@
+"""
+GPU implementation of the gravitational and magnetic induction fields
+produced by rectangular prisms, using the same closed-form formulas of
+Nagy et al (2000, 2002) and the modified arctangent and logarithm
+functions of Fukushima (2020) as the Numba CPU implementation in
+'rectangular_prism_numba.py'. Each CUDA thread computes the field at one
+point and iterates over the prisms in a serial loop, accumulating the
+sum in a register before writing it to global memory once.
+"""
+
+import math
+
+import numpy as np
+from numba import cuda
+from .. import check
+from .. import constants as cts
+from . import rectangular_prism_numba as rp_nb
+
+# number of threads per one-dimensional block used to launch the kernels
+THREADS_PER_BLOCK = 128
+
+
+def _require_cuda():
+    """
+    Raise an informative error when no usable CUDA device is present.
+    """
+    if not cuda.is_available():
+        raise RuntimeError(
+            "the CUDA implementation requires a CUDA-capable GPU and a "
+            "working CUDA driver - use the functions in "
+            "'rectangular_prism_numba' to compute on the CPU"
+        )
+
+
+def grav(coordinates, prisms, density, field, scale=True):
+    """
+    Gravitational potential, first and second derivatives
+    produced by right-rectangular prisms in Cartesian coordinates,
+    computed on the GPU. Takes the same parameters and returns the same
+    result as the function 'grav' in 'rectangular_prism_numba'.
+    """
+
+    # Verify the input parameters
+    D = check.are_coordinates(coordinates)  # D = total number of data points
+    P = check.are_rectangular_prisms(prisms)  # P = total number of prisms
+    check.is_array(density, ndim=1, shape=(P,))
+
+    # Available fields (integer ids shared with the CPU implementation)
+    fields = {
+        "potential": rp_nb.FIELD_POTENTIAL,
+        "x": rp_nb.FIELD_X,
+        "y": rp_nb.FIELD_Y,
+        "z": rp_nb.FIELD_Z,
+        "xx": rp_nb.FIELD_XX,
+        "xy": rp_nb.FIELD_XY,
+        "xz": rp_nb.FIELD_XZ,
+        "yy": rp_nb.FIELD_YY,
+        "yz": rp_nb.FIELD_YZ,
+        "zz": rp_nb.FIELD_ZZ,
+    }
+
+    # Verify the field
+    if field not in fields:
+        raise ValueError("Gravitational field {} not recognized".format(field))
+
+    _require_cuda()
+
+    # convert the input containers into contiguous 1d arrays
+    arrays = rp_nb._unpack_arrays(coordinates, prisms, density)
+
+    # create the device array to store the result
+    out = cuda.device_array(D, dtype="float64")
+
+    # Compute gravitational field with one thread per computation point
+    blocks = (D + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+    cuda_grav[blocks, THREADS_PER_BLOCK](
+        *(cuda.to_device(array) for array in arrays), fields[field], out
+    )
+    result = out.copy_to_host()
+
+    # multiply the computed field by the corresponding scale factors
+    if scale is True:
+        result *= cts.GRAVITATIONAL_CONST
+        # Convert from m/s^2 to mGal
+        if field in ["x", "y", "z"]:
+            result *= cts.SI2MGAL
+        # Convert from 1/s^2 to Eötvös
+        if field in ["xx", "xy", "xz", "yy", "yz", "zz"]:
+            result *= cts.SI2EOTVOS
+
+    return result
+
+
+def mag(coordinates, prisms, mx, my, mz, field, scale=True):
+    """
+    Magnetic scalar potential and magnetic induction components
+    produced by right-rectangular prisms in Cartesian coordinates,
+    computed on the GPU. Takes the same parameters and returns the same
+    result as the function 'mag' in 'rectangular_prism_numba'.
+    """
+
+    # Verify the input parameters
+    D = check.are_coordinates(coordinates)  # D = total number of data points
+    P = check.are_rectangular_prisms(prisms)  # P = total number of prisms
+    check.is_array(mx, ndim=1, shape=(P,))
+    check.is_array(my, ndim=1, shape=(P,))
+    check.is_array(mz, ndim=1, shape=(P,))
+
+    # Available fields (integer ids shared with the CPU implementation)
+    fields = {
+        "potential": {
+            "x": rp_nb.FIELD_X,
+            "y": rp_nb.FIELD_Y,
+            "z": rp_nb.FIELD_Z,
+        },
+        "z": {
+            "x": rp_nb.FIELD_XZ,
+            "y": rp_nb.FIELD_YZ,
+            "z": rp_nb.FIELD_ZZ,
+        },
+        "y": {
+            "x": rp_nb.FIELD_XY,
+            "y": rp_nb.FIELD_YY,
+            "z": rp_nb.FIELD_YZ,
+        },
+        "x": {
+            "x": rp_nb.FIELD_XX,
+            "y": rp_nb.FIELD_XY,
+            "z": rp_nb.FIELD_XZ,
+        },
+    }
+
+    # Verify the field
+    if field not in fields:
+        raise ValueError("Magnetic field {} not recognized".format(field))
+
+    _require_cuda()
+
+    # convert the input containers into contiguous 1d arrays
+    arrays = rp_nb._unpack_arrays(coordinates, prisms, mx, my, mz)
+
+    # create the device array to store the result
+    out = cuda.device_array(D, dtype="float64")
+
+    # Compute magnetic field with one thread per computation point
+    blocks = (D + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+    cuda_mag[blocks, THREADS_PER_BLOCK](
+        *(cuda.to_device(array) for array in arrays),
+        fields[field]["x"],
+        fields[field]["y"],
+        fields[field]["z"],
+        out,
+    )
+    result = out.copy_to_host()
+
+    # multiply the computed field by the corresponding scale factors
+    if scale is True:
+        result *= cts.CM
+        # Convert from T to nT
+        if field in ["x", "y", "z"]:
+            result *= cts.T2NT
+        # Convert from T to uT and change sign
+        if field == "potential":
+            result *= -cts.T2MT
+
+    return result
+
+
+@cuda.jit
+def cuda_grav(cx, cy, cz, x1, x2, y1, y2, z1, z2, density, field_id, out):
+    """
+    Compute the gravitational field at the points in 'cx', 'cy', 'cz'
+    """
+    # Each thread handles one computation point and accumulates the
+    # contribution of all prisms in a register before the single write
+    # to global memory.
+    l = cuda.grid(1)
+    if l < cx.shape[0]:
+        # hoist the point coordinates to locals so they stay in
+        # registers over the prism sweep
+        cx_l = cx[l]
+        cy_l = cy[l]
+        cz_l = cz[l]
+        total = 0.0
+        # Iterate over prisms
+        for p in range(x1.shape[0]):
+            # Change coordinates
+            X1 = x1[p] - cx_l
+            X2 = x2[p] - cx_l
+            Y1 = y1[p] - cy_l
+            Y2 = y2[p] - cy_l
+            Z1 = z1[p] - cz_l
+            Z2 = z2[p] - cz_l
+            # Compute the field
+            total += density[p] * _dispatch_field(
+                field_id, X1, X2, Y1, Y2, Z1, Z2
+            )
+        out[l] = total
+
+
+@cuda.jit
+def cuda_mag(
+    cx,
+    cy,
+    cz,
+    x1,
+    x2,
+    y1,
+    y2,
+    z1,
+    z2,
+    mx,
+    my,
+    mz,
+    fieldx_id,
+    fieldy_id,
+    fieldz_id,
+    out,
+):
+    """
+    Compute the magnetic field at the points in 'cx', 'cy', 'cz'
+    """
+    # Each thread handles one computation point and accumulates the
+    # contribution of all prisms in a register before the single write
+    # to global memory.
+    l = cuda.grid(1)
+    if l < cx.shape[0]:
+        # hoist the point coordinates to locals so they stay in
+        # registers over the prism sweep
+        cx_l = cx[l]
+        cy_l = cy[l]
+        cz_l = cz[l]
+        total = 0.0
+        # Iterate over prisms
+        for p in range(x1.shape[0]):
+            # Change coordinates
+            X1 = x1[p] - cx_l
+            X2 = x2[p] - cx_l
+            Y1 = y1[p] - cy_l
+            Y2 = y2[p] - cy_l
+            Z1 = z1[p] - cz_l
+            Z2 = z2[p] - cz_l
+            # Compute the field components
+            total += mx[p] * _dispatch_field(fieldx_id, X1, X2, Y1, Y2, Z1, Z2)
+            total += my[p] * _dispatch_field(fieldy_id, X1, X2, Y1, Y2, Z1, Z2)
+            total += mz[p] * _dispatch_field(fieldz_id, X1, X2, Y1, Y2, Z1, Z2)
+        out[l] = total
+
+
+# device versions of the modified arctangent and logarithm functions of
+# Fukushima (2020) defined in 'utils'
+
+
+@cuda.jit(device=True)
+def safe_atan2(y, x):
+    """
+    Principal value of the arctangent expressed as a two variable function
+    (device version of 'utils.safe_atan2_entrywise').
+    """
+    if x != 0.0:
+        result = math.atan(y / x)
+    else:
+        if y > 0.0:
+            result = math.pi / 2
+        elif y < 0.0:
+            result = -math.pi / 2
+        else:
+            result = 0.0
+    return result
+
+
+@cuda.jit(device=True)
+def safe_log(x):
+    """
+    Modified log to return 0 for log(0)
+    (device version of 'utils.safe_log_entrywise').
+    """
+    if abs(x) < 1e-10:
+        result = 0.0
+    else:
+        result = math.log(x)
+    return result
+
+
+# fused kernels evaluated at the 8 vertices of a prism, sharing the math
+# of the CPU implementation in 'rectangular_prism_numba'
+
+
+@cuda.jit(device=True)
+def field_grav_potential(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Y2 = X2 * Y2
+    X2Z2 = X2 * Z2
+    Y2Z2 = Y2 * Z2
+    X2Z1 = X2 * Z1
+    Y2Z1 = Y2 * Z1
+    X1Y2 = X1 * Y2
+    X1Z2 = X1 * Z2
+    X1Z1 = X1 * Z1
+    X2Y1 = X2 * Y1
+    Y1Z2 = Y1 * Z2
+    Y1Z1 = Y1 * Z1
+    X1Y1 = X1 * Y1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (
+            X2Y2 * safe_log(Z2 + R222)
+            + X2Z2 * safe_log(Y2 + R222)
+            + Y2Z2 * safe_log(X2 + R222)
+            - 0.5 * Y2Y2 * safe_atan2(X2Z2, Y2 * R222)
+            - 0.5 * X2X2 * safe_atan2(Y2Z2, X2 * R222)
+            - 0.5 * Z2Z2 * safe_atan2(X2Y2, Z2 * R222)
+        )
+        - (
+            X2Y2 * safe_log(Z1 + R221)
+            + X2Z1 * safe_log(Y2 + R221)
+            + Y2Z1 * safe_log(X2 + R221)
+            - 0.5 * Y2Y2 * safe_atan2(X2Z1, Y2 * R221)
+            - 0.5 * X2X2 * safe_atan2(Y2Z1, X2 * R221)
+            - 0.5 * Z1Z1 * safe_atan2(X2Y2, Z1 * R221)
+        )
+        - (
+            X1Y2 * safe_log(Z2 + R122)
+            + X1Z2 * safe_log(Y2 + R122)
+            + Y2Z2 * safe_log(X1 + R122)
+            - 0.5 * Y2Y2 * safe_atan2(X1Z2, Y2 * R122)
+            - 0.5 * X1X1 * safe_atan2(Y2Z2, X1 * R122)
+            - 0.5 * Z2Z2 * safe_atan2(X1Y2, Z2 * R122)
+        )
+        + (
+            X1Y2 * safe_log(Z1 + R121)
+            + X1Z1 * safe_log(Y2 + R121)
+            + Y2Z1 * safe_log(X1 + R121)
+            - 0.5 * Y2Y2 * safe_atan2(X1Z1, Y2 * R121)
+            - 0.5 * X1X1 * safe_atan2(Y2Z1, X1 * R121)
+            - 0.5 * Z1Z1 * safe_atan2(X1Y2, Z1 * R121)
+        )
+        - (
+            X2Y1 * safe_log(Z2 + R212)
+            + X2Z2 * safe_log(Y1 + R212)
+            + Y1Z2 * safe_log(X2 + R212)
+            - 0.5 * Y1Y1 * safe_atan2(X2Z2, Y1 * R212)
+            - 0.5 * X2X2 * safe_atan2(Y1Z2, X2 * R212)
+            - 0.5 * Z2Z2 * safe_atan2(X2Y1, Z2 * R212)
+        )
+        + (
+            X2Y1 * safe_log(Z1 + R211)
+            + X2Z1 * safe_log(Y1 + R211)
+            + Y1Z1 * safe_log(X2 + R211)
+            - 0.5 * Y1Y1 * safe_atan2(X2Z1, Y1 * R211)
+            - 0.5 * X2X2 * safe_atan2(Y1Z1, X2 * R211)
+            - 0.5 * Z1Z1 * safe_atan2(X2Y1, Z1 * R211)
+        )
+        + (
+            X1Y1 * safe_log(Z2 + R112)
+            + X1Z2 * safe_log(Y1 + R112)
+            + Y1Z2 * safe_log(X1 + R112)
+            - 0.5 * Y1Y1 * safe_atan2(X1Z2, Y1 * R112)
+            - 0.5 * X1X1 * safe_atan2(Y1Z2, X1 * R112)
+            - 0.5 * Z2Z2 * safe_atan2(X1Y1, Z2 * R112)
+        )
+        - (
+            X1Y1 * safe_log(Z1 + R111)
+            + X1Z1 * safe_log(Y1 + R111)
+            + Y1Z1 * safe_log(X1 + R111)
+            - 0.5 * Y1Y1 * safe_atan2(X1Z1, Y1 * R111)
+            - 0.5 * X1X1 * safe_atan2(Y1Z1, X1 * R111)
+            - 0.5 * Z1Z1 * safe_atan2(X1Y1, Z1 * R111)
+        )
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def field_grav_x(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the x-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    Y2Z2 = Y2 * Z2
+    Y2Z1 = Y2 * Z1
+    Y1Z2 = Y1 * Z2
+    Y1Z1 = Y1 * Z1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (
+            -(
+                Y2 * safe_log(Z2 + R222)
+                + Z2 * safe_log(Y2 + R222)
+                - X2 * safe_atan2(Y2Z2, X2 * R222)
+            )
+        )
+        - (
+            -(
+                Y2 * safe_log(Z1 + R221)
+                + Z1 * safe_log(Y2 + R221)
+                - X2 * safe_atan2(Y2Z1, X2 * R221)
+            )
+        )
+        - (
+            -(
+                Y2 * safe_log(Z2 + R122)
+                + Z2 * safe_log(Y2 + R122)
+                - X1 * safe_atan2(Y2Z2, X1 * R122)
+            )
+        )
+        + (
+            -(
+                Y2 * safe_log(Z1 + R121)
+                + Z1 * safe_log(Y2 + R121)
+                - X1 * safe_atan2(Y2Z1, X1 * R121)
+            )
+        )
+        - (
+            -(
+                Y1 * safe_log(Z2 + R212)
+                + Z2 * safe_log(Y1 + R212)
+                - X2 * safe_atan2(Y1Z2, X2 * R212)
+            )
+        )
+        + (
+            -(
+                Y1 * safe_log(Z1 + R211)
+                + Z1 * safe_log(Y1 + R211)
+                - X2 * safe_atan2(Y1Z1, X2 * R211)
+            )
+        )
+        + (
+            -(
+                Y1 * safe_log(Z2 + R112)
+                + Z2 * safe_log(Y1 + R112)
+                - X1 * safe_atan2(Y1Z2, X1 * R112)
+            )
+        )
+        - (
+            -(
+                Y1 * safe_log(Z1 + R111)
+                + Z1 * safe_log(Y1 + R111)
+                - X1 * safe_atan2(Y1Z1, X1 * R111)
+            )
+        )
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def field_grav_y(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the y-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Z2 = X2 * Z2
+    X2Z1 = X2 * Z1
+    X1Z2 = X1 * Z2
+    X1Z1 = X1 * Z1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (
+            -(
+                X2 * safe_log(Z2 + R222)
+                + Z2 * safe_log(X2 + R222)
+                - Y2 * safe_atan2(X2Z2, Y2 * R222)
+            )
+        )
+        - (
+            -(
+                X2 * safe_log(Z1 + R221)
+                + Z1 * safe_log(X2 + R221)
+                - Y2 * safe_atan2(X2Z1, Y2 * R221)
+            )
+        )
+        - (
+            -(
+                X1 * safe_log(Z2 + R122)
+                + Z2 * safe_log(X1 + R122)
+                - Y2 * safe_atan2(X1Z2, Y2 * R122)
+            )
+        )
+        + (
+            -(
+                X1 * safe_log(Z1 + R121)
+                + Z1 * safe_log(X1 + R121)
+                - Y2 * safe_atan2(X1Z1, Y2 * R121)
+            )
+        )
+        - (
+            -(
+                X2 * safe_log(Z2 + R212)
+                + Z2 * safe_log(X2 + R212)
+                - Y1 * safe_atan2(X2Z2, Y1 * R212)
+            )
+        )
+        + (
+            -(
+                X2 * safe_log(Z1 + R211)
+                + Z1 * safe_log(X2 + R211)
+                - Y1 * safe_atan2(X2Z1, Y1 * R211)
+            )
+        )
+        + (
+            -(
+                X1 * safe_log(Z2 + R112)
+                + Z2 * safe_log(X1 + R112)
+                - Y1 * safe_atan2(X1Z2, Y1 * R112)
+            )
+        )
+        - (
+            -(
+                X1 * safe_log(Z1 + R111)
+                + Z1 * safe_log(X1 + R111)
+                - Y1 * safe_atan2(X1Z1, Y1 * R111)
+            )
+        )
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def field_grav_z(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the z-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Y2 = X2 * Y2
+    X1Y2 = X1 * Y2
+    X2Y1 = X2 * Y1
+    X1Y1 = X1 * Y1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (
+            -(
+                Y2 * safe_log(X2 + R222)
+                + X2 * safe_log(Y2 + R222)
+                - Z2 * safe_atan2(X2Y2, Z2 * R222)
+            )
+        )
+        - (
+            -(
+                Y2 * safe_log(X2 + R221)
+                + X2 * safe_log(Y2 + R221)
+                - Z1 * safe_atan2(X2Y2, Z1 * R221)
+            )
+        )
+        - (
+            -(
+                Y2 * safe_log(X1 + R122)
+                + X1 * safe_log(Y2 + R122)
+                - Z2 * safe_atan2(X1Y2, Z2 * R122)
+            )
+        )
+        + (
+            -(
+                Y2 * safe_log(X1 + R121)
+                + X1 * safe_log(Y2 + R121)
+                - Z1 * safe_atan2(X1Y2, Z1 * R121)
+            )
+        )
+        - (
+            -(
+                Y1 * safe_log(X2 + R212)
+                + X2 * safe_log(Y1 + R212)
+                - Z2 * safe_atan2(X2Y1, Z2 * R212)
+            )
+        )
+        + (
+            -(
+                Y1 * safe_log(X2 + R211)
+                + X2 * safe_log(Y1 + R211)
+                - Z1 * safe_atan2(X2Y1, Z1 * R211)
+            )
+        )
+        + (
+            -(
+                Y1 * safe_log(X1 + R112)
+                + X1 * safe_log(Y1 + R112)
+                - Z2 * safe_atan2(X1Y1, Z2 * R112)
+            )
+        )
+        - (
+            -(
+                Y1 * safe_log(X1 + R111)
+                + X1 * safe_log(Y1 + R111)
+                - Z1 * safe_atan2(X1Y1, Z1 * R111)
+            )
+        )
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def field_grav_xx(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the xx-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    Y2Z2 = Y2 * Z2
+    Y2Z1 = Y2 * Z1
+    Y1Z2 = Y1 * Z2
+    Y1Z1 = Y1 * Z1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (-safe_atan2(Y2Z2, X2 * R222))
+        - (-safe_atan2(Y2Z1, X2 * R221))
+        - (-safe_atan2(Y2Z2, X1 * R122))
+        + (-safe_atan2(Y2Z1, X1 * R121))
+        - (-safe_atan2(Y1Z2, X2 * R212))
+        + (-safe_atan2(Y1Z1, X2 * R211))
+        + (-safe_atan2(Y1Z2, X1 * R112))
+        - (-safe_atan2(Y1Z1, X1 * R111))
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def field_grav_xy(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the xy-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        safe_log(Z2 + R222)
+        - safe_log(Z1 + R221)
+        - safe_log(Z2 + R122)
+        + safe_log(Z1 + R121)
+        - safe_log(Z2 + R212)
+        + safe_log(Z1 + R211)
+        + safe_log(Z2 + R112)
+        - safe_log(Z1 + R111)
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def field_grav_xz(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the xz-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        safe_log(Y2 + R222)
+        - safe_log(Y2 + R221)
+        - safe_log(Y2 + R122)
+        + safe_log(Y2 + R121)
+        - safe_log(Y1 + R212)
+        + safe_log(Y1 + R211)
+        + safe_log(Y1 + R112)
+        - safe_log(Y1 + R111)
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def field_grav_yy(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the yy-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Z2 = X2 * Z2
+    X2Z1 = X2 * Z1
+    X1Z2 = X1 * Z2
+    X1Z1 = X1 * Z1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (-safe_atan2(X2Z2, Y2 * R222))
+        - (-safe_atan2(X2Z1, Y2 * R221))
+        - (-safe_atan2(X1Z2, Y2 * R122))
+        + (-safe_atan2(X1Z1, Y2 * R121))
+        - (-safe_atan2(X2Z2, Y1 * R212))
+        + (-safe_atan2(X2Z1, Y1 * R211))
+        + (-safe_atan2(X1Z2, Y1 * R112))
+        - (-safe_atan2(X1Z1, Y1 * R111))
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def field_grav_yz(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the yz-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        safe_log(X2 + R222)
+        - safe_log(X2 + R221)
+        - safe_log(X1 + R122)
+        + safe_log(X1 + R121)
+        - safe_log(X2 + R212)
+        + safe_log(X2 + R211)
+        + safe_log(X1 + R112)
+        - safe_log(X1 + R111)
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def field_grav_zz(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the zz-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Y2 = X2 * Y2
+    X1Y2 = X1 * Y2
+    X2Y1 = X2 * Y1
+    X1Y1 = X1 * Y1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (-safe_atan2(X2Y2, Z2 * R222))
+        - (-safe_atan2(X2Y2, Z1 * R221))
+        - (-safe_atan2(X1Y2, Z2 * R122))
+        + (-safe_atan2(X1Y2, Z1 * R121))
+        - (-safe_atan2(X2Y1, Z2 * R212))
+        + (-safe_atan2(X2Y1, Z1 * R211))
+        + (-safe_atan2(X1Y1, Z2 * R112))
+        - (-safe_atan2(X1Y1, Z1 * R111))
+    )
+    return result
+
+
+@cuda.jit(device=True)
+def _dispatch_field(field_id, X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Evaluate the fused kernel selected by 'field_id'. Uses the same
+    integer ids as the CPU implementation in 'rectangular_prism_numba'.
+    """
+    if field_id == rp_nb.FIELD_POTENTIAL:
+        result = field_grav_potential(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == rp_nb.FIELD_X:
+        result = field_grav_x(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == rp_nb.FIELD_Y:
+        result = field_grav_y(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == rp_nb.FIELD_Z:
+        result = field_grav_z(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == rp_nb.FIELD_XX:
+        result = field_grav_xx(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == rp_nb.FIELD_XY:
+        result = field_grav_xy(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == rp_nb.FIELD_XZ:
+        result = field_grav_xz(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == rp_nb.FIELD_YY:
+        result = field_grav_yy(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == rp_nb.FIELD_YZ:
+        result = field_grav_yz(X1, X2, Y1, Y2, Z1, Z2)
+    else:
+        result = field_grav_zz(X1, X2, Y1, Y2, Z1, Z2)
+    return result
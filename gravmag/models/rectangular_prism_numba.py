@@ -2,19 +2,40 @@
 This code presents a general approach for implementing the gravitational
 and magnetic induction fields produced
 by rectangular prisms by using the closed-form formulas of
-Nagy et al (2000, 2002). This prototype makes use of the modified arctangent and logarithm 
+Nagy et al (2000, 2002). This prototype makes use of the modified arctangent and logarithm
 functions proposed by Fukushima (2020) for dealing with singularities at some computation points.
 """
 
+import math
+
 import numpy as np
-from numba import njit
+from numba import njit, prange
 from .. import check
 from .. import utils
 from .. import constants as cts
 from .. import inverse_distance as idist
 
+# integer identifiers used to select the fused kernel inside the jitted loops
+FIELD_POTENTIAL = 0
+FIELD_X = 1
+FIELD_Y = 2
+FIELD_Z = 3
+FIELD_XX = 4
+FIELD_XY = 5
+FIELD_XZ = 6
+FIELD_YY = 7
+FIELD_YZ = 8
+FIELD_ZZ = 9
+
+# tile sizes used to cache-block the loops over computation points and
+# prisms in 'jit_grav' and 'jit_mag'. PTILE keeps the working set of
+# prism corner coordinates (PTILE * 6 * 8 bytes ~ 24 kB) resident in the
+# L1 cache while it is reused by the DTILE points of the same tile.
+DTILE = 64
+PTILE = 512
+
 
-def grav(coordinates, prisms, density, field, scale=True):
+def grav(coordinates, prisms, density, field, scale=True, dtype="float64"):
     """
     Gravitational potential, first and second derivatives
     produced by right-rectangular prisms in Cartesian coordinates.
@@ -52,6 +73,11 @@ def grav(coordinates, prisms, density, field, scale=True):
         "constants.GRAVITATIONAL_CONST" (Gravitational constant),
         "constants.SI2MGAL" (constant tranforming from m/s² to mGal) or
         "constants.SI2EOTVOS" (constant tranforming from 1/s² to Eötvos)
+    dtype : string
+        Floating-point precision of the computation, either 'float64'
+        (default) or 'float32'. Single precision halves the memory
+        traffic and doubles the SIMD throughput at the cost of ~7
+        significant digits in the result.
 
     Returns
     -------
@@ -67,28 +93,37 @@ def grav(coordinates, prisms, density, field, scale=True):
 
     # Available fields
     fields = {
-        "potential": kernel_inverse_r,
-        "x": kernel_dx,
-        "y": kernel_dy,
-        "z": kernel_dz,
-        "xx": kernel_dxx,
-        "xy": kernel_dxy,
-        "xz": kernel_dxz,
-        "yy": kernel_dyy,
-        "yz": kernel_dyz,
-        "zz": kernel_dzz,
+        "potential": FIELD_POTENTIAL,
+        "x": FIELD_X,
+        "y": FIELD_Y,
+        "z": FIELD_Z,
+        "xx": FIELD_XX,
+        "xy": FIELD_XY,
+        "xz": FIELD_XZ,
+        "yy": FIELD_YY,
+        "yz": FIELD_YZ,
+        "zz": FIELD_ZZ,
     }
 
     # Verify the field
     if field not in fields:
         raise ValueError("Gravitational field {} not recognized".format(field))
 
+    # Verify the floating-point precision
+    if dtype not in ["float64", "float32"]:
+        raise ValueError("dtype {} not recognized".format(dtype))
+
+    # convert the input containers into contiguous 1d arrays
+    cx, cy, cz, x1, x2, y1, y2, z1, z2, density = _unpack_arrays(
+        coordinates, prisms, density, dtype=dtype
+    )
+
     # create the array to store the result
-    result = np.zeros(D, dtype="float64")
+    result = np.zeros(D, dtype=dtype)
 
     # Compute gravitational field
 
-    jit_grav(coordinates, prisms, density, fields[field], result)
+    jit_grav(cx, cy, cz, x1, x2, y1, y2, z1, z2, density, fields[field], result)
 
     # multiply the computed field by the corresponding scale factors
     if scale is True:
@@ -103,7 +138,7 @@ def grav(coordinates, prisms, density, field, scale=True):
     return result
 
 
-def mag(coordinates, prisms, mx, my, mz, field, scale=True):
+def mag(coordinates, prisms, mx, my, mz, field, scale=True, dtype="float64"):
     """
     Magnetic scalar potential and magnetic induction components
     produced by right-rectangular prisms in Cartesian coordinates.
@@ -135,6 +170,11 @@ def mag(coordinates, prisms, mx, my, mz, field, scale=True):
        "constants.CM" (Magnetic constant),
        "constants.T2MT" (constant tranforming from Tesla to microtesla) or
        "constants.T2NT" (constant tranforming from Tesla to nanotesla)
+    dtype : string
+        Floating-point precision of the computation, either 'float64'
+        (default) or 'float32'. Single precision halves the memory
+        traffic and doubles the SIMD throughput at the cost of ~7
+        significant digits in the result.
 
     Returns
     -------
@@ -152,24 +192,50 @@ def mag(coordinates, prisms, mx, my, mz, field, scale=True):
 
     # Available fields
     fields = {
-        "potential": {"x": kernel_dx, "y": kernel_dy, "z": kernel_dz},
-        "z": {"x": kernel_dxz, "y": kernel_dyz, "z": kernel_dzz},
-        "y": {"x": kernel_dxy, "y": kernel_dyy, "z": kernel_dyz},
-        "x": {"x": kernel_dxx, "y": kernel_dxy, "z": kernel_dxz},
+        "potential": {"x": FIELD_X, "y": FIELD_Y, "z": FIELD_Z},
+        "z": {"x": FIELD_XZ, "y": FIELD_YZ, "z": FIELD_ZZ},
+        "y": {"x": FIELD_XY, "y": FIELD_YY, "z": FIELD_YZ},
+        "x": {"x": FIELD_XX, "y": FIELD_XY, "z": FIELD_XZ},
     }
 
     # Verify the field
     if field not in fields:
         raise ValueError("Magnetic field {} not recognized".format(field))
 
+    # Verify the floating-point precision
+    if dtype not in ["float64", "float32"]:
+        raise ValueError("dtype {} not recognized".format(dtype))
+
+    # convert the input containers into contiguous 1d arrays
+    cx, cy, cz, x1, x2, y1, y2, z1, z2, mx, my, mz = _unpack_arrays(
+        coordinates, prisms, mx, my, mz, dtype=dtype
+    )
+
     # create the array to store the result
-    result = np.zeros(D, dtype="float64")
+    result = np.zeros(D, dtype=dtype)
 
     # Compute magnetic field
     fieldx = fields[field]["x"]
     fieldy = fields[field]["y"]
     fieldz = fields[field]["z"]
-    jit_mag(coordinates, prisms, mx, my, mz, fieldx, fieldy, fieldz, result)
+    jit_mag(
+        cx,
+        cy,
+        cz,
+        x1,
+        x2,
+        y1,
+        y2,
+        z1,
+        z2,
+        mx,
+        my,
+        mz,
+        fieldx,
+        fieldy,
+        fieldz,
+        result,
+    )
 
     # multiply the computed field by the corresponding scale factors
     if scale is True:
@@ -184,203 +250,853 @@ def mag(coordinates, prisms, mx, my, mz, field, scale=True):
     return result
 
 
-@njit
-def jit_grav(coordinates, prisms, density, field, out):
-    """
-    Compute the gravitational field at the points in 'coordinates'
-    """
-    # Iterate over computation points
-    for l in range(coordinates[0].size):
-        # Iterate over prisms
-        for p in range(prisms.shape[0]):
-            # Change coordinates
-            X1 = prisms[p, 0] - coordinates[0, l]
-            X2 = prisms[p, 1] - coordinates[0, l]
-            Y1 = prisms[p, 2] - coordinates[1, l]
-            Y2 = prisms[p, 3] - coordinates[1, l]
-            Z1 = prisms[p, 4] - coordinates[2, l]
-            Z2 = prisms[p, 5] - coordinates[2, l]
-            # Compute the field
-            out[l] += density[p] * (
-                field(X2, Y2, Z2)
-                - field(X2, Y2, Z1)
-                - field(X1, Y2, Z2)
-                + field(X1, Y2, Z1)
-                - field(X2, Y1, Z2)
-                + field(X2, Y1, Z1)
-                + field(X1, Y1, Z2)
-                - field(X1, Y1, Z1)
-            )
+def _unpack_coordinates(coordinates, dtype="float64"):
+    """
+    Convert the dictionary of computation points into three contiguous
+    1d arrays of 'dtype' (one per coordinate axis).
+    Run ``check.are_coordinates`` before.
+    """
+    cx = np.ascontiguousarray(coordinates["x"], dtype=dtype)
+    cy = np.ascontiguousarray(coordinates["y"], dtype=dtype)
+    cz = np.ascontiguousarray(coordinates["z"], dtype=dtype)
+    return cx, cy, cz
 
 
-@njit
-def jit_mag(coordinates, prisms, mx, my, mz, fieldx, fieldy, fieldz, out):
-    """
-    Compute the magnetic field at the points in 'coordinates'
-    """
-    # Iterate over computation points
-    for l in range(coordinates[0].size):
-        # Iterate over prisms
-        for p in range(prisms.shape[0]):
-            # Change coordinates
-            X1 = prisms[p, 0] - coordinates[0, l]
-            X2 = prisms[p, 1] - coordinates[0, l]
-            Y1 = prisms[p, 2] - coordinates[1, l]
-            Y2 = prisms[p, 3] - coordinates[1, l]
-            Z1 = prisms[p, 4] - coordinates[2, l]
-            Z2 = prisms[p, 5] - coordinates[2, l]
-            # Compute the field component x
-            out[l] += mx[p] * (
-                fieldx(X2, Y2, Z2)
-                - fieldx(X2, Y2, Z1)
-                - fieldx(X1, Y2, Z2)
-                + fieldx(X1, Y2, Z1)
-                - fieldx(X2, Y1, Z2)
-                + fieldx(X2, Y1, Z1)
-                + fieldx(X1, Y1, Z2)
-                - fieldx(X1, Y1, Z1)
-            )
-            # Compute the field component y
-            out[l] += my[p] * (
-                fieldy(X2, Y2, Z2)
-                - fieldy(X2, Y2, Z1)
-                - fieldy(X1, Y2, Z2)
-                + fieldy(X1, Y2, Z1)
-                - fieldy(X2, Y1, Z2)
-                + fieldy(X2, Y1, Z1)
-                + fieldy(X1, Y1, Z2)
-                - fieldy(X1, Y1, Z1)
-            )
-            # Compute the field component z
-            out[l] += mz[p] * (
-                fieldz(X2, Y2, Z2)
-                - fieldz(X2, Y2, Z1)
-                - fieldz(X1, Y2, Z2)
-                + fieldz(X1, Y2, Z1)
-                - fieldz(X2, Y1, Z2)
-                + fieldz(X2, Y1, Z1)
-                + fieldz(X1, Y1, Z2)
-                - fieldz(X1, Y1, Z1)
-            )
+def _unpack_prisms(prisms, dtype="float64"):
+    """
+    Convert the dictionary of prisms into six contiguous 1d arrays of
+    'dtype' (one per corner coordinate), so that the inner loop of the
+    jitted functions streams the prism data with unit stride.
+    Run ``check.are_rectangular_prisms`` before.
+    """
+    x1 = np.ascontiguousarray(prisms["x1"], dtype=dtype)
+    x2 = np.ascontiguousarray(prisms["x2"], dtype=dtype)
+    y1 = np.ascontiguousarray(prisms["y1"], dtype=dtype)
+    y2 = np.ascontiguousarray(prisms["y2"], dtype=dtype)
+    z1 = np.ascontiguousarray(prisms["z1"], dtype=dtype)
+    z2 = np.ascontiguousarray(prisms["z2"], dtype=dtype)
+    return x1, x2, y1, y2, z1, z2
+
 
+def _unpack_arrays(coordinates, prisms, *properties, dtype="float64"):
+    """
+    Convert the coordinates and prisms dictionaries, plus any physical
+    property arrays (density or magnetization components), into the
+    contiguous 1d arrays of 'dtype' taken by the jitted functions. Doing
+    the whole conversion in one place guarantees that only plain arrays
+    cross the JIT boundary, avoiding the per-call reflection cost of
+    Python containers.
+    Run ``check.are_coordinates`` and ``check.are_rectangular_prisms``
+    before.
+    """
+    arrays = _unpack_coordinates(coordinates, dtype) + _unpack_prisms(
+        prisms, dtype
+    )
+    for prop in properties:
+        arrays += (np.ascontiguousarray(prop, dtype=dtype),)
+    return arrays
 
-# kernels
+
+@njit(parallel=True, fastmath=True, boundscheck=False, cache=True)
+def jit_grav(cx, cy, cz, x1, x2, y1, y2, z1, z2, density, field_id, out):
+    """
+    Compute the gravitational field at the points in 'cx', 'cy', 'cz'
+    """
+    D = cx.size
+    P = x1.size
+    # Iterate over tiles of computation points in parallel. Each
+    # iteration writes only to its own out[l] entries, so there is no
+    # race between threads. The prisms are traversed in blocks of PTILE
+    # so that their corner coordinates stay in cache while all points of
+    # the tile reuse them; for a given point the prisms are still summed
+    # in increasing order, keeping the summation deterministic.
+    for t in prange((D + DTILE - 1) // DTILE):
+        d0 = t * DTILE
+        d1 = min(d0 + DTILE, D)
+        # Iterate over blocks of prisms
+        for p0 in range(0, P, PTILE):
+            p1 = min(p0 + PTILE, P)
+            for l in range(d0, d1):
+                # hoist the point coordinates and the accumulator to
+                # locals so they stay in registers over the prism sweep
+                cx_l = cx[l]
+                cy_l = cy[l]
+                cz_l = cz[l]
+                acc = out[l]
+                for p in range(p0, p1):
+                    # Change coordinates
+                    X1 = x1[p] - cx_l
+                    X2 = x2[p] - cx_l
+                    Y1 = y1[p] - cy_l
+                    Y2 = y2[p] - cy_l
+                    Z1 = z1[p] - cz_l
+                    Z2 = z2[p] - cz_l
+                    # Compute the field
+                    acc += density[p] * _dispatch_field(
+                        field_id, X1, X2, Y1, Y2, Z1, Z2
+                    )
+                out[l] = acc
 
 
-@njit
-def kernel_inverse_r(X, Y, Z):
+@njit(parallel=True, fastmath=True, boundscheck=False, cache=True)
+def jit_mag(
+    cx,
+    cy,
+    cz,
+    x1,
+    x2,
+    y1,
+    y2,
+    z1,
+    z2,
+    mx,
+    my,
+    mz,
+    fieldx_id,
+    fieldy_id,
+    fieldz_id,
+    out,
+):
     """
-    Function for computing the inverse distance kernel
+    Compute the magnetic field at the points in 'cx', 'cy', 'cz'
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
+    D = cx.size
+    P = x1.size
+    # Iterate over tiles of computation points in parallel. Each
+    # iteration writes only to its own out[l] entries, so there is no
+    # race between threads. The prisms are traversed in blocks of PTILE
+    # so that their corner coordinates stay in cache while all points of
+    # the tile reuse them; for a given point the prisms are still summed
+    # in increasing order, keeping the summation deterministic.
+    for t in prange((D + DTILE - 1) // DTILE):
+        d0 = t * DTILE
+        d1 = min(d0 + DTILE, D)
+        # Iterate over blocks of prisms
+        for p0 in range(0, P, PTILE):
+            p1 = min(p0 + PTILE, P)
+            for l in range(d0, d1):
+                # hoist the point coordinates and the accumulator to
+                # locals so they stay in registers over the prism sweep
+                cx_l = cx[l]
+                cy_l = cy[l]
+                cz_l = cz[l]
+                acc = out[l]
+                for p in range(p0, p1):
+                    # Change coordinates
+                    X1 = x1[p] - cx_l
+                    X2 = x2[p] - cx_l
+                    Y1 = y1[p] - cy_l
+                    Y2 = y2[p] - cy_l
+                    Z1 = z1[p] - cz_l
+                    Z2 = z2[p] - cz_l
+                    # Compute the field components
+                    acc += mx[p] * _dispatch_field(
+                        fieldx_id, X1, X2, Y1, Y2, Z1, Z2
+                    )
+                    acc += my[p] * _dispatch_field(
+                        fieldy_id, X1, X2, Y1, Y2, Z1, Z2
+                    )
+                    acc += mz[p] * _dispatch_field(
+                        fieldz_id, X1, X2, Y1, Y2, Z1, Z2
+                    )
+                out[l] = acc
+
+
+# fused kernels evaluated at the 8 vertices of a prism
+
+
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_potential(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Y2 = X2 * Y2
+    X2Z2 = X2 * Z2
+    Y2Z2 = Y2 * Z2
+    X2Z1 = X2 * Z1
+    Y2Z1 = Y2 * Z1
+    X1Y2 = X1 * Y2
+    X1Z2 = X1 * Z2
+    X1Z1 = X1 * Z1
+    X2Y1 = X2 * Y1
+    Y1Z2 = Y1 * Z2
+    Y1Z1 = Y1 * Z1
+    X1Y1 = X1 * Y1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
     result = (
-        Y * X * utils.safe_log_entrywise(Z + R)
-        + X * Z * utils.safe_log_entrywise(Y + R)
-        + Y * Z * utils.safe_log_entrywise(X + R)
-        - 0.5 * Y**2 * utils.safe_atan2_entrywise(Z * X, Y * R)
-        - 0.5 * X**2 * utils.safe_atan2_entrywise(Z * Y, X * R)
-        - 0.5 * Z**2 * utils.safe_atan2_entrywise(Y * X, Z * R)
+        (
+            X2Y2 * utils.safe_log_entrywise(Z2 + R222)
+            + X2Z2 * utils.safe_log_entrywise(Y2 + R222)
+            + Y2Z2 * utils.safe_log_entrywise(X2 + R222)
+            - 0.5 * Y2Y2 * utils.safe_atan2_entrywise(X2Z2, Y2 * R222)
+            - 0.5 * X2X2 * utils.safe_atan2_entrywise(Y2Z2, X2 * R222)
+            - 0.5 * Z2Z2 * utils.safe_atan2_entrywise(X2Y2, Z2 * R222)
+        )
+        - (
+            X2Y2 * utils.safe_log_entrywise(Z1 + R221)
+            + X2Z1 * utils.safe_log_entrywise(Y2 + R221)
+            + Y2Z1 * utils.safe_log_entrywise(X2 + R221)
+            - 0.5 * Y2Y2 * utils.safe_atan2_entrywise(X2Z1, Y2 * R221)
+            - 0.5 * X2X2 * utils.safe_atan2_entrywise(Y2Z1, X2 * R221)
+            - 0.5 * Z1Z1 * utils.safe_atan2_entrywise(X2Y2, Z1 * R221)
+        )
+        - (
+            X1Y2 * utils.safe_log_entrywise(Z2 + R122)
+            + X1Z2 * utils.safe_log_entrywise(Y2 + R122)
+            + Y2Z2 * utils.safe_log_entrywise(X1 + R122)
+            - 0.5 * Y2Y2 * utils.safe_atan2_entrywise(X1Z2, Y2 * R122)
+            - 0.5 * X1X1 * utils.safe_atan2_entrywise(Y2Z2, X1 * R122)
+            - 0.5 * Z2Z2 * utils.safe_atan2_entrywise(X1Y2, Z2 * R122)
+        )
+        + (
+            X1Y2 * utils.safe_log_entrywise(Z1 + R121)
+            + X1Z1 * utils.safe_log_entrywise(Y2 + R121)
+            + Y2Z1 * utils.safe_log_entrywise(X1 + R121)
+            - 0.5 * Y2Y2 * utils.safe_atan2_entrywise(X1Z1, Y2 * R121)
+            - 0.5 * X1X1 * utils.safe_atan2_entrywise(Y2Z1, X1 * R121)
+            - 0.5 * Z1Z1 * utils.safe_atan2_entrywise(X1Y2, Z1 * R121)
+        )
+        - (
+            X2Y1 * utils.safe_log_entrywise(Z2 + R212)
+            + X2Z2 * utils.safe_log_entrywise(Y1 + R212)
+            + Y1Z2 * utils.safe_log_entrywise(X2 + R212)
+            - 0.5 * Y1Y1 * utils.safe_atan2_entrywise(X2Z2, Y1 * R212)
+            - 0.5 * X2X2 * utils.safe_atan2_entrywise(Y1Z2, X2 * R212)
+            - 0.5 * Z2Z2 * utils.safe_atan2_entrywise(X2Y1, Z2 * R212)
+        )
+        + (
+            X2Y1 * utils.safe_log_entrywise(Z1 + R211)
+            + X2Z1 * utils.safe_log_entrywise(Y1 + R211)
+            + Y1Z1 * utils.safe_log_entrywise(X2 + R211)
+            - 0.5 * Y1Y1 * utils.safe_atan2_entrywise(X2Z1, Y1 * R211)
+            - 0.5 * X2X2 * utils.safe_atan2_entrywise(Y1Z1, X2 * R211)
+            - 0.5 * Z1Z1 * utils.safe_atan2_entrywise(X2Y1, Z1 * R211)
+        )
+        + (
+            X1Y1 * utils.safe_log_entrywise(Z2 + R112)
+            + X1Z2 * utils.safe_log_entrywise(Y1 + R112)
+            + Y1Z2 * utils.safe_log_entrywise(X1 + R112)
+            - 0.5 * Y1Y1 * utils.safe_atan2_entrywise(X1Z2, Y1 * R112)
+            - 0.5 * X1X1 * utils.safe_atan2_entrywise(Y1Z2, X1 * R112)
+            - 0.5 * Z2Z2 * utils.safe_atan2_entrywise(X1Y1, Z2 * R112)
+        )
+        - (
+            X1Y1 * utils.safe_log_entrywise(Z1 + R111)
+            + X1Z1 * utils.safe_log_entrywise(Y1 + R111)
+            + Y1Z1 * utils.safe_log_entrywise(X1 + R111)
+            - 0.5 * Y1Y1 * utils.safe_atan2_entrywise(X1Z1, Y1 * R111)
+            - 0.5 * X1X1 * utils.safe_atan2_entrywise(Y1Z1, X1 * R111)
+            - 0.5 * Z1Z1 * utils.safe_atan2_entrywise(X1Y1, Z1 * R111)
+        )
     )
     return result
 
 
-@njit
-def kernel_dz(X, Y, Z):
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_x(X1, X2, Y1, Y2, Z1, Z2):
     """
-    Function for computing the z-derivative of inverse distance kernel
+    Signed sum of the x-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    result = -(
-        Y * utils.safe_log_entrywise(X + R)
-        + X * utils.safe_log_entrywise(Y + R)
-        - Z * utils.safe_atan2_entrywise(Y * X, Z * R)
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    Y2Z2 = Y2 * Z2
+    Y2Z1 = Y2 * Z1
+    Y1Z2 = Y1 * Z2
+    Y1Z1 = Y1 * Z1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (
+            -(
+                Y2 * utils.safe_log_entrywise(Z2 + R222)
+                + Z2 * utils.safe_log_entrywise(Y2 + R222)
+                - X2 * utils.safe_atan2_entrywise(Y2Z2, X2 * R222)
+            )
+        )
+        - (
+            -(
+                Y2 * utils.safe_log_entrywise(Z1 + R221)
+                + Z1 * utils.safe_log_entrywise(Y2 + R221)
+                - X2 * utils.safe_atan2_entrywise(Y2Z1, X2 * R221)
+            )
+        )
+        - (
+            -(
+                Y2 * utils.safe_log_entrywise(Z2 + R122)
+                + Z2 * utils.safe_log_entrywise(Y2 + R122)
+                - X1 * utils.safe_atan2_entrywise(Y2Z2, X1 * R122)
+            )
+        )
+        + (
+            -(
+                Y2 * utils.safe_log_entrywise(Z1 + R121)
+                + Z1 * utils.safe_log_entrywise(Y2 + R121)
+                - X1 * utils.safe_atan2_entrywise(Y2Z1, X1 * R121)
+            )
+        )
+        - (
+            -(
+                Y1 * utils.safe_log_entrywise(Z2 + R212)
+                + Z2 * utils.safe_log_entrywise(Y1 + R212)
+                - X2 * utils.safe_atan2_entrywise(Y1Z2, X2 * R212)
+            )
+        )
+        + (
+            -(
+                Y1 * utils.safe_log_entrywise(Z1 + R211)
+                + Z1 * utils.safe_log_entrywise(Y1 + R211)
+                - X2 * utils.safe_atan2_entrywise(Y1Z1, X2 * R211)
+            )
+        )
+        + (
+            -(
+                Y1 * utils.safe_log_entrywise(Z2 + R112)
+                + Z2 * utils.safe_log_entrywise(Y1 + R112)
+                - X1 * utils.safe_atan2_entrywise(Y1Z2, X1 * R112)
+            )
+        )
+        - (
+            -(
+                Y1 * utils.safe_log_entrywise(Z1 + R111)
+                + Z1 * utils.safe_log_entrywise(Y1 + R111)
+                - X1 * utils.safe_atan2_entrywise(Y1Z1, X1 * R111)
+            )
+        )
     )
     return result
 
 
-@njit
-def kernel_dy(X, Y, Z):
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_y(X1, X2, Y1, Y2, Z1, Z2):
     """
-    Function for computing the y-derivative of inverse distance kernel
+    Signed sum of the y-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    result = -(
-        X * utils.safe_log_entrywise(Z + R)
-        + Z * utils.safe_log_entrywise(X + R)
-        - Y * utils.safe_atan2_entrywise(X * Z, Y * R)
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Z2 = X2 * Z2
+    X2Z1 = X2 * Z1
+    X1Z2 = X1 * Z2
+    X1Z1 = X1 * Z1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (
+            -(
+                X2 * utils.safe_log_entrywise(Z2 + R222)
+                + Z2 * utils.safe_log_entrywise(X2 + R222)
+                - Y2 * utils.safe_atan2_entrywise(X2Z2, Y2 * R222)
+            )
+        )
+        - (
+            -(
+                X2 * utils.safe_log_entrywise(Z1 + R221)
+                + Z1 * utils.safe_log_entrywise(X2 + R221)
+                - Y2 * utils.safe_atan2_entrywise(X2Z1, Y2 * R221)
+            )
+        )
+        - (
+            -(
+                X1 * utils.safe_log_entrywise(Z2 + R122)
+                + Z2 * utils.safe_log_entrywise(X1 + R122)
+                - Y2 * utils.safe_atan2_entrywise(X1Z2, Y2 * R122)
+            )
+        )
+        + (
+            -(
+                X1 * utils.safe_log_entrywise(Z1 + R121)
+                + Z1 * utils.safe_log_entrywise(X1 + R121)
+                - Y2 * utils.safe_atan2_entrywise(X1Z1, Y2 * R121)
+            )
+        )
+        - (
+            -(
+                X2 * utils.safe_log_entrywise(Z2 + R212)
+                + Z2 * utils.safe_log_entrywise(X2 + R212)
+                - Y1 * utils.safe_atan2_entrywise(X2Z2, Y1 * R212)
+            )
+        )
+        + (
+            -(
+                X2 * utils.safe_log_entrywise(Z1 + R211)
+                + Z1 * utils.safe_log_entrywise(X2 + R211)
+                - Y1 * utils.safe_atan2_entrywise(X2Z1, Y1 * R211)
+            )
+        )
+        + (
+            -(
+                X1 * utils.safe_log_entrywise(Z2 + R112)
+                + Z2 * utils.safe_log_entrywise(X1 + R112)
+                - Y1 * utils.safe_atan2_entrywise(X1Z2, Y1 * R112)
+            )
+        )
+        - (
+            -(
+                X1 * utils.safe_log_entrywise(Z1 + R111)
+                + Z1 * utils.safe_log_entrywise(X1 + R111)
+                - Y1 * utils.safe_atan2_entrywise(X1Z1, Y1 * R111)
+            )
+        )
     )
     return result
 
 
-@njit
-def kernel_dx(X, Y, Z):
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_z(X1, X2, Y1, Y2, Z1, Z2):
     """
-    Function for computing the x-derivative of inverse distance kernel
+    Signed sum of the z-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    result = -(
-        Y * utils.safe_log_entrywise(Z + R)
-        + Z * utils.safe_log_entrywise(Y + R)
-        - X * utils.safe_atan2_entrywise(Y * Z, X * R)
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Y2 = X2 * Y2
+    X1Y2 = X1 * Y2
+    X2Y1 = X2 * Y1
+    X1Y1 = X1 * Y1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (
+            -(
+                Y2 * utils.safe_log_entrywise(X2 + R222)
+                + X2 * utils.safe_log_entrywise(Y2 + R222)
+                - Z2 * utils.safe_atan2_entrywise(X2Y2, Z2 * R222)
+            )
+        )
+        - (
+            -(
+                Y2 * utils.safe_log_entrywise(X2 + R221)
+                + X2 * utils.safe_log_entrywise(Y2 + R221)
+                - Z1 * utils.safe_atan2_entrywise(X2Y2, Z1 * R221)
+            )
+        )
+        - (
+            -(
+                Y2 * utils.safe_log_entrywise(X1 + R122)
+                + X1 * utils.safe_log_entrywise(Y2 + R122)
+                - Z2 * utils.safe_atan2_entrywise(X1Y2, Z2 * R122)
+            )
+        )
+        + (
+            -(
+                Y2 * utils.safe_log_entrywise(X1 + R121)
+                + X1 * utils.safe_log_entrywise(Y2 + R121)
+                - Z1 * utils.safe_atan2_entrywise(X1Y2, Z1 * R121)
+            )
+        )
+        - (
+            -(
+                Y1 * utils.safe_log_entrywise(X2 + R212)
+                + X2 * utils.safe_log_entrywise(Y1 + R212)
+                - Z2 * utils.safe_atan2_entrywise(X2Y1, Z2 * R212)
+            )
+        )
+        + (
+            -(
+                Y1 * utils.safe_log_entrywise(X2 + R211)
+                + X2 * utils.safe_log_entrywise(Y1 + R211)
+                - Z1 * utils.safe_atan2_entrywise(X2Y1, Z1 * R211)
+            )
+        )
+        + (
+            -(
+                Y1 * utils.safe_log_entrywise(X1 + R112)
+                + X1 * utils.safe_log_entrywise(Y1 + R112)
+                - Z2 * utils.safe_atan2_entrywise(X1Y1, Z2 * R112)
+            )
+        )
+        - (
+            -(
+                Y1 * utils.safe_log_entrywise(X1 + R111)
+                + X1 * utils.safe_log_entrywise(Y1 + R111)
+                - Z1 * utils.safe_atan2_entrywise(X1Y1, Z1 * R111)
+            )
+        )
     )
     return result
 
 
-@njit
-def kernel_dzz(X, Y, Z):
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_xx(X1, X2, Y1, Y2, Z1, Z2):
     """
-    Function for computing the zz-derivative of inverse distance kernel
+    Signed sum of the xx-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    result = -utils.safe_atan2_entrywise(Y * X, Z * R)
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    Y2Z2 = Y2 * Z2
+    Y2Z1 = Y2 * Z1
+    Y1Z2 = Y1 * Z2
+    Y1Z1 = Y1 * Z1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (-utils.safe_atan2_entrywise(Y2Z2, X2 * R222))
+        - (-utils.safe_atan2_entrywise(Y2Z1, X2 * R221))
+        - (-utils.safe_atan2_entrywise(Y2Z2, X1 * R122))
+        + (-utils.safe_atan2_entrywise(Y2Z1, X1 * R121))
+        - (-utils.safe_atan2_entrywise(Y1Z2, X2 * R212))
+        + (-utils.safe_atan2_entrywise(Y1Z1, X2 * R211))
+        + (-utils.safe_atan2_entrywise(Y1Z2, X1 * R112))
+        - (-utils.safe_atan2_entrywise(Y1Z1, X1 * R111))
+    )
+    return result
+
+
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_xy(X1, X2, Y1, Y2, Z1, Z2):
+    """
+    Signed sum of the xy-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
+    """
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        utils.safe_log_entrywise(Z2 + R222)
+        - utils.safe_log_entrywise(Z1 + R221)
+        - utils.safe_log_entrywise(Z2 + R122)
+        + utils.safe_log_entrywise(Z1 + R121)
+        - utils.safe_log_entrywise(Z2 + R212)
+        + utils.safe_log_entrywise(Z1 + R211)
+        + utils.safe_log_entrywise(Z2 + R112)
+        - utils.safe_log_entrywise(Z1 + R111)
+    )
     return result
 
 
-@njit
-def kernel_dyz(X, Y, Z):
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_xz(X1, X2, Y1, Y2, Z1, Z2):
     """
-    Function for computing the yz-derivative of inverse distance kernel
+    Signed sum of the xz-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    result = utils.safe_log_entrywise(X + R)
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        utils.safe_log_entrywise(Y2 + R222)
+        - utils.safe_log_entrywise(Y2 + R221)
+        - utils.safe_log_entrywise(Y2 + R122)
+        + utils.safe_log_entrywise(Y2 + R121)
+        - utils.safe_log_entrywise(Y1 + R212)
+        + utils.safe_log_entrywise(Y1 + R211)
+        + utils.safe_log_entrywise(Y1 + R112)
+        - utils.safe_log_entrywise(Y1 + R111)
+    )
     return result
 
 
-@njit
-def kernel_dxz(X, Y, Z):
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_yy(X1, X2, Y1, Y2, Z1, Z2):
     """
-    Function for computing the xz-derivative of inverse distance kernel
+    Signed sum of the yy-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    result = utils.safe_log_entrywise(Y + R)
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Z2 = X2 * Z2
+    X2Z1 = X2 * Z1
+    X1Z2 = X1 * Z2
+    X1Z1 = X1 * Z1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (-utils.safe_atan2_entrywise(X2Z2, Y2 * R222))
+        - (-utils.safe_atan2_entrywise(X2Z1, Y2 * R221))
+        - (-utils.safe_atan2_entrywise(X1Z2, Y2 * R122))
+        + (-utils.safe_atan2_entrywise(X1Z1, Y2 * R121))
+        - (-utils.safe_atan2_entrywise(X2Z2, Y1 * R212))
+        + (-utils.safe_atan2_entrywise(X2Z1, Y1 * R211))
+        + (-utils.safe_atan2_entrywise(X1Z2, Y1 * R112))
+        - (-utils.safe_atan2_entrywise(X1Z1, Y1 * R111))
+    )
     return result
 
 
-@njit
-def kernel_dyy(X, Y, Z):
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_yz(X1, X2, Y1, Y2, Z1, Z2):
     """
-    Function for computing the yy-derivative of inverse distance kernel
+    Signed sum of the yz-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    result = -utils.safe_atan2_entrywise(X * Z, Y * R)
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        utils.safe_log_entrywise(X2 + R222)
+        - utils.safe_log_entrywise(X2 + R221)
+        - utils.safe_log_entrywise(X1 + R122)
+        + utils.safe_log_entrywise(X1 + R121)
+        - utils.safe_log_entrywise(X2 + R212)
+        + utils.safe_log_entrywise(X2 + R211)
+        + utils.safe_log_entrywise(X1 + R112)
+        - utils.safe_log_entrywise(X1 + R111)
+    )
     return result
 
 
-@njit
-def kernel_dxy(X, Y, Z):
+@njit(
+    [
+        "float64(float64, float64, float64, float64, float64, float64)",
+        "float32(float32, float32, float32, float32, float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
+def field_grav_zz(X1, X2, Y1, Y2, Z1, Z2):
     """
-    Function for computing the xy-derivative of inverse distance kernel
+    Signed sum of the zz-derivative of inverse distance kernel evaluated
+    at the 8 vertices of a prism
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    result = utils.safe_log_entrywise(Z + R)
+    # squares and cross products shared by the corner evaluations
+    X1X1 = X1 * X1
+    Y1Y1 = Y1 * Y1
+    Z1Z1 = Z1 * Z1
+    Z2Z2 = Z2 * Z2
+    Y2Y2 = Y2 * Y2
+    X2X2 = X2 * X2
+    X2Y2 = X2 * Y2
+    X1Y2 = X1 * Y2
+    X2Y1 = X2 * Y1
+    X1Y1 = X1 * Y1
+    R111 = math.sqrt(X1X1 + Y1Y1 + Z1Z1)
+    R112 = math.sqrt(X1X1 + Y1Y1 + Z2Z2)
+    R121 = math.sqrt(X1X1 + Y2Y2 + Z1Z1)
+    R122 = math.sqrt(X1X1 + Y2Y2 + Z2Z2)
+    R211 = math.sqrt(X2X2 + Y1Y1 + Z1Z1)
+    R212 = math.sqrt(X2X2 + Y1Y1 + Z2Z2)
+    R221 = math.sqrt(X2X2 + Y2Y2 + Z1Z1)
+    R222 = math.sqrt(X2X2 + Y2Y2 + Z2Z2)
+    result = (
+        (-utils.safe_atan2_entrywise(X2Y2, Z2 * R222))
+        - (-utils.safe_atan2_entrywise(X2Y2, Z1 * R221))
+        - (-utils.safe_atan2_entrywise(X1Y2, Z2 * R122))
+        + (-utils.safe_atan2_entrywise(X1Y2, Z1 * R121))
+        - (-utils.safe_atan2_entrywise(X2Y1, Z2 * R212))
+        + (-utils.safe_atan2_entrywise(X2Y1, Z1 * R211))
+        + (-utils.safe_atan2_entrywise(X1Y1, Z2 * R112))
+        - (-utils.safe_atan2_entrywise(X1Y1, Z1 * R111))
+    )
     return result
 
 
-@njit
-def kernel_dxx(X, Y, Z):
+@njit(
+    [
+        "float64(int64, float64, float64, float64, float64, float64, float64)",
+        "float32(int64, float32, float32, float32, float32, float32, float32)",
+    ],
+    fastmath=True,
+    cache=True,
+)
+def _dispatch_field(field_id, X1, X2, Y1, Y2, Z1, Z2):
     """
-    Function for computing the xx-derivative of inverse distance kernel
+    Evaluate the fused kernel selected by 'field_id'. Passing a plain
+    integer instead of a first-class function value keeps the signatures
+    of 'jit_grav' and 'jit_mag' free of function types, so their compiled
+    versions can be cached and reused across all fields. The helper is
+    deliberately not forced inline: the ten fused kernels are already
+    inlined into its body, and duplicating all of them inside the
+    parallel loops makes compilation prohibitively expensive.
     """
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    result = -utils.safe_atan2_entrywise(Y * Z, X * R)
+    if field_id == FIELD_POTENTIAL:
+        result = field_grav_potential(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == FIELD_X:
+        result = field_grav_x(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == FIELD_Y:
+        result = field_grav_y(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == FIELD_Z:
+        result = field_grav_z(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == FIELD_XX:
+        result = field_grav_xx(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == FIELD_XY:
+        result = field_grav_xy(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == FIELD_XZ:
+        result = field_grav_xz(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == FIELD_YY:
+        result = field_grav_yy(X1, X2, Y1, Y2, Z1, Z2)
+    elif field_id == FIELD_YZ:
+        result = field_grav_yz(X1, X2, Y1, Y2, Z1, Z2)
+    else:
+        result = field_grav_zz(X1, X2, Y1, Y2, Z1, Z2)
     return result
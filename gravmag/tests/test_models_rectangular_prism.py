@@ -267,6 +267,92 @@ def test_rectangular_prism_compare_reference_values():
     aae(reference, computed, decimal=3)  #
 
 
+def test_grav_numbaXnumpy():
+    "Verify if results obtained with numba and numpy are equal to each other"
+    model = {
+        "x1": np.array([-130.0, 20.0]),
+        "x2": np.array([100.0, 250.0]),
+        "y1": np.array([-100.0, -300.0]),
+        "y2": np.array([100.0, -50.0]),
+        "z1": np.array([100.0, 20.0]),
+        "z2": np.array([213.0, 345.0]),
+    }
+    coords = {
+        "x": np.array([0, 30, -62.1]),
+        "y": np.array([0, -10, 80]),
+        "z": np.array([-1, 0, -2]),
+    }
+    rho = np.array([1300.0, -800.0])
+    for field in [
+        "potential",
+        "x",
+        "y",
+        "z",
+        "xx",
+        "xy",
+        "xz",
+        "yy",
+        "yz",
+        "zz",
+    ]:
+        result_numba = rp_nb.grav(coords, model, rho, field=field)
+        result_numpy = rp.grav(coords, model, rho, field=field)
+        aae(result_numba, result_numpy, decimal=8)
+
+
+def test_mag_numbaXnumpy():
+    "Verify if results obtained with numba and numpy are equal to each other"
+    model = {
+        "x1": np.array([-130.0, 20.0]),
+        "x2": np.array([100.0, 250.0]),
+        "y1": np.array([-100.0, -300.0]),
+        "y2": np.array([100.0, -50.0]),
+        "z1": np.array([100.0, 20.0]),
+        "z2": np.array([213.0, 345.0]),
+    }
+    coords = {
+        "x": np.array([0, 30, -62.1]),
+        "y": np.array([0, -10, 80]),
+        "z": np.array([-1, 0, -2]),
+    }
+    mx = np.array([1.5, -0.7])
+    my = np.array([-0.3, 1.1])
+    mz = np.array([2.2, 0.9])
+    for field in ["potential", "x", "y", "z"]:
+        result_numba = rp_nb.mag(coords, model, mx, my, mz, field=field)
+        result_numpy = rp.mag(coords, model, mx, my, mz, field=field)
+        aae(result_numba, result_numpy, decimal=8)
+
+
+def test_mag_float32Xfloat64():
+    "Verify if the float32 fast path agrees with float64 to ~3 digits"
+    model = {
+        "x1": np.array([-130.0, 20.0]),
+        "x2": np.array([100.0, 250.0]),
+        "y1": np.array([-100.0, -300.0]),
+        "y2": np.array([100.0, -50.0]),
+        "z1": np.array([100.0, 20.0]),
+        "z2": np.array([213.0, 345.0]),
+    }
+    coords = {
+        "x": np.array([0, 30, -62.1]),
+        "y": np.array([0, -10, 80]),
+        "z": np.array([-1, 0, -2]),
+    }
+    mx = np.array([1.5, -0.7])
+    my = np.array([-0.3, 1.1])
+    mz = np.array([2.2, 0.9])
+    for field in ["potential", "x", "y", "z"]:
+        result_64 = rp_nb.mag(coords, model, mx, my, mz, field=field)
+        result_32 = rp_nb.mag(
+            coords, model, mx, my, mz, field=field, dtype="float32"
+        )
+        ae(result_32.dtype, np.dtype("float32"))
+        # compare the ratio to 1 so the check is on significant digits
+        # instead of an absolute tolerance
+        aae(result_32 / result_64, np.ones(result_64.size), decimal=3)
+
+
 ##### kernels
 
 
@@ -301,21 +387,16 @@ def test_kernel_potential_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_inverse_r(X2, Y2, Z2)
-                - rp_nb.kernel_inverse_r(X2, Y2, Z1)
-                - rp_nb.kernel_inverse_r(X1, Y2, Z2)
-                + rp_nb.kernel_inverse_r(X1, Y2, Z1)
-                - rp_nb.kernel_inverse_r(X2, Y1, Z2)
-                + rp_nb.kernel_inverse_r(X2, Y1, Z1)
-                + rp_nb.kernel_inverse_r(X1, Y1, Z2)
-                - rp_nb.kernel_inverse_r(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_potential(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(
         coords, model, rho, rp.kernel_potential_grav
     )
-    aae(result_numba, result_numpy, decimal=8)
+    # the potential values are of order 1e7, so decimal=6 still checks
+    # the two implementations down to a relative error of about 1e-13
+    aae(result_numba, result_numpy, decimal=6)
 
 
 def test_kernel_x_numbaXnumpy():
@@ -349,15 +430,8 @@ def test_kernel_x_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_dx(X2, Y2, Z2)
-                - rp_nb.kernel_dx(X2, Y2, Z1)
-                - rp_nb.kernel_dx(X1, Y2, Z2)
-                + rp_nb.kernel_dx(X1, Y2, Z1)
-                - rp_nb.kernel_dx(X2, Y1, Z2)
-                + rp_nb.kernel_dx(X2, Y1, Z1)
-                + rp_nb.kernel_dx(X1, Y1, Z2)
-                - rp_nb.kernel_dx(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_x(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(coords, model, rho, rp.kernel_x)
@@ -395,15 +469,8 @@ def test_kernel_y_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_dy(X2, Y2, Z2)
-                - rp_nb.kernel_dy(X2, Y2, Z1)
-                - rp_nb.kernel_dy(X1, Y2, Z2)
-                + rp_nb.kernel_dy(X1, Y2, Z1)
-                - rp_nb.kernel_dy(X2, Y1, Z2)
-                + rp_nb.kernel_dy(X2, Y1, Z1)
-                + rp_nb.kernel_dy(X1, Y1, Z2)
-                - rp_nb.kernel_dy(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_y(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(coords, model, rho, rp.kernel_y)
@@ -441,15 +508,8 @@ def test_kernel_z_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_dz(X2, Y2, Z2)
-                - rp_nb.kernel_dz(X2, Y2, Z1)
-                - rp_nb.kernel_dz(X1, Y2, Z2)
-                + rp_nb.kernel_dz(X1, Y2, Z1)
-                - rp_nb.kernel_dz(X2, Y1, Z2)
-                + rp_nb.kernel_dz(X2, Y1, Z1)
-                + rp_nb.kernel_dz(X1, Y1, Z2)
-                - rp_nb.kernel_dz(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_z(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(coords, model, rho, rp.kernel_z)
@@ -487,15 +547,8 @@ def test_kernel_xx_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_dxx(X2, Y2, Z2)
-                - rp_nb.kernel_dxx(X2, Y2, Z1)
-                - rp_nb.kernel_dxx(X1, Y2, Z2)
-                + rp_nb.kernel_dxx(X1, Y2, Z1)
-                - rp_nb.kernel_dxx(X2, Y1, Z2)
-                + rp_nb.kernel_dxx(X2, Y1, Z1)
-                + rp_nb.kernel_dxx(X1, Y1, Z2)
-                - rp_nb.kernel_dxx(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_xx(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(coords, model, rho, rp.kernel_xx)
@@ -533,15 +586,8 @@ def test_kernel_xy_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_dxy(X2, Y2, Z2)
-                - rp_nb.kernel_dxy(X2, Y2, Z1)
-                - rp_nb.kernel_dxy(X1, Y2, Z2)
-                + rp_nb.kernel_dxy(X1, Y2, Z1)
-                - rp_nb.kernel_dxy(X2, Y1, Z2)
-                + rp_nb.kernel_dxy(X2, Y1, Z1)
-                + rp_nb.kernel_dxy(X1, Y1, Z2)
-                - rp_nb.kernel_dxy(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_xy(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(coords, model, rho, rp.kernel_xy)
@@ -579,15 +625,8 @@ def test_kernel_xz_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_dxz(X2, Y2, Z2)
-                - rp_nb.kernel_dxz(X2, Y2, Z1)
-                - rp_nb.kernel_dxz(X1, Y2, Z2)
-                + rp_nb.kernel_dxz(X1, Y2, Z1)
-                - rp_nb.kernel_dxz(X2, Y1, Z2)
-                + rp_nb.kernel_dxz(X2, Y1, Z1)
-                + rp_nb.kernel_dxz(X1, Y1, Z2)
-                - rp_nb.kernel_dxz(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_xz(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(coords, model, rho, rp.kernel_xz)
@@ -625,15 +664,8 @@ def test_kernel_yy_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_dyy(X2, Y2, Z2)
-                - rp_nb.kernel_dyy(X2, Y2, Z1)
-                - rp_nb.kernel_dyy(X1, Y2, Z2)
-                + rp_nb.kernel_dyy(X1, Y2, Z1)
-                - rp_nb.kernel_dyy(X2, Y1, Z2)
-                + rp_nb.kernel_dyy(X2, Y1, Z1)
-                + rp_nb.kernel_dyy(X1, Y1, Z2)
-                - rp_nb.kernel_dyy(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_yy(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(coords, model, rho, rp.kernel_yy)
@@ -671,15 +703,8 @@ def test_kernel_yz_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_dyz(X2, Y2, Z2)
-                - rp_nb.kernel_dyz(X2, Y2, Z1)
-                - rp_nb.kernel_dyz(X1, Y2, Z2)
-                + rp_nb.kernel_dyz(X1, Y2, Z1)
-                - rp_nb.kernel_dyz(X2, Y1, Z2)
-                + rp_nb.kernel_dyz(X2, Y1, Z1)
-                + rp_nb.kernel_dyz(X1, Y1, Z2)
-                - rp_nb.kernel_dyz(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_yz(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(coords, model, rho, rp.kernel_yz)
@@ -717,15 +742,8 @@ def test_kernel_zz_numbaXnumpy():
             Z1 = model["z1"][p] - coords["z"][d]
             Z2 = model["z2"][p] - coords["z"][d]
             # Compute the field
-            result_numba[d] += rho[p] * (
-                rp_nb.kernel_dzz(X2, Y2, Z2)
-                - rp_nb.kernel_dzz(X2, Y2, Z1)
-                - rp_nb.kernel_dzz(X1, Y2, Z2)
-                + rp_nb.kernel_dzz(X1, Y2, Z1)
-                - rp_nb.kernel_dzz(X2, Y1, Z2)
-                + rp_nb.kernel_dzz(X2, Y1, Z1)
-                + rp_nb.kernel_dzz(X1, Y1, Z2)
-                - rp_nb.kernel_dzz(X1, Y1, Z1)
+            result_numba[d] += rho[p] * rp_nb.field_grav_zz(
+                X1, X2, Y1, Y2, Z1, Z2
             )
     # compute with numpy
     result_numpy = rp.iterate_over_vertices(coords, model, rho, rp.kernel_zz)
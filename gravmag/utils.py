@@ -1,9 +1,19 @@
+import math
+
 import numpy as np
 from numba import njit
 from . import check
 
 
-@njit
+@njit(
+    [
+        "float64(float64, float64)",
+        "float32(float32, float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
 def safe_atan2_entrywise(y, x):
     """
     Principal value of the arctangent expressed as a two variable function
@@ -15,18 +25,17 @@ def safe_atan2_entrywise(y, x):
     Fukushima (2020, eq. 72).
     """
     if x != 0.0:
-        result = np.arctan(y / x)
+        result = math.atan(y / x)
     else:
         if y > 0.0:
-            result = np.pi / 2
+            result = math.pi / 2
         elif y < 0.0:
-            result = -np.pi / 2
+            result = -math.pi / 2
         else:
             result = 0.0
     return result
 
 
-@njit
 def safe_atan2(y, x):
     """
     Principal value of the arctangent expressed as a two variable function
@@ -36,19 +45,19 @@ def safe_atan2(y, x):
     Therefore, it guarantees that the fields satisfies the symmetry properties
     of the prism. This modified function has been defined according to
     Fukushima (2020, eq. 72).
+
+    This implementation is branchless: the denominator is masked before
+    the division, so the arctangent runs through the vectorized NumPy
+    routine instead of an entrywise loop.
     """
-    result = np.empty_like(x)
-    for i in range(result.shape[0]):
-        for j in range(result.shape[1]):
-            if x[i, j] != 0.0:
-                result[i, j] = np.arctan(y[i, j] / x[i, j])
-            else:
-                if y[i, j] > 0.0:
-                    result[i, j] = np.pi / 2
-                elif y[i, j] < 0.0:
-                    result[i, j] = -np.pi / 2
-                else:
-                    result[i, j] = 0.0
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    nonzero_x = x != 0.0
+    result = np.where(
+        nonzero_x,
+        np.arctan(y / np.where(nonzero_x, x, 1.0)),
+        np.sign(y) * np.pi / 2,
+    )
     return result
 
 
@@ -76,32 +85,41 @@ def safe_atan2_np(y, x):
     return result
 
 
-@njit
+@njit(
+    [
+        "float64(float64)",
+        "float32(float32)",
+    ],
+    inline="always",
+    fastmath=True,
+    cache=True,
+)
 def safe_log_entrywise(x):
     """
     Modified log to return 0 for log(0).
     The limits in the formula terms tend to 0.
     """
-    if np.abs(x) < 1e-10:
+    if abs(x) < 1e-10:
         result = 0.0
     else:
-        result = np.log(x)
+        result = math.log(x)
     return result
 
 
-@njit
 def safe_log(x):
     """
     Modified log to return 0 for log(0).
     The limits in the formula terms tend to 0.
+
+    This implementation is branchless: entries with absolute value below
+    the threshold are replaced by 1 before the logarithm, so log(1) = 0
+    is produced for them by the vectorized NumPy routine.
     """
-    result = np.empty_like(x)
-    for i in range(result.shape[0]):
-        for j in range(result.shape[1]):
-            if np.abs(x[i, j]) < 1e-10:
-                result[i, j] = 0.0
-            else:
-                result[i, j] = np.log(x[i, j])
+    x = np.asarray(x, dtype=float)
+    # negative arguments produce nan, exactly as in the entrywise
+    # version, but without raising a runtime warning
+    with np.errstate(invalid="ignore"):
+        result = np.log(np.where(np.abs(x) >= 1e-10, x, 1.0))
     return result
 
 